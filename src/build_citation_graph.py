@@ -6,7 +6,7 @@ import requests
 import argparse
 import bibtexparser
 from wasabi import msg
-from thefuzz import fuzz
+from rapidfuzz import fuzz
 from tqdm import tqdm
 from ratelimit import limits, sleep_and_retry
 from grobid_client.grobid_client import GrobidClient
@@ -15,6 +15,7 @@ from utils.reviz_graph_model import (
     build_graph_model,
     find_author,
     citation_matching,
+    load_user_answers,
 )
 
 
@@ -140,6 +141,9 @@ def augment_reviz_graph(
         "Start augmenting citation graph with data from bibliographic APIs"
     )
 
+    # Reuse the answers the user gave in previous runs
+    load_user_answers(graph_dir)
+
     # Load ReViz graph model
     with open(graph_dir + in_filename, encoding="utf-8") as f:
         graph = json.load(f)
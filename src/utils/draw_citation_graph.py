@@ -1,56 +1,111 @@
 import os
+import re
 import json
+import hashlib
 import math
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-import seaborn as sns
 import networkx as nx
 from wasabi import msg
-import matplotlib.pyplot as plt
-from pyvis.network import Network
 
+try:
+    # orjson parses large JSON files considerably faster than json
+    import orjson
 
-def get_additional_properties(raw_graph, key_to_label):
+    def load_json(filename):
+        with open(filename, "rb") as f:
+            return orjson.loads(f.read())
+
+except ImportError:
+
+    def load_json(filename):
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
 
-    filename = "paper_categories.xlsx"
-    if os.path.isfile(filename):
-        categories = pd.read_excel(filename, sheet_name="main", header=[0])
-        categories.set_index("Paper", inplace=True)
-    else:
-        categories = None
 
-    all_keys = [article["key"] for article in raw_graph["articles"]]
+try:
+    # python-calamine parses xlsx files much faster than openpyxl, but
+    # pandas only supports it as an engine from version 2.2 onwards
+    import python_calamine
 
-    props = {}
-    all_years = []
-    all_ids = []
-    for key in all_keys:
+    pandas_version = tuple(int(v) for v in pd.__version__.split(".")[:2])
+    EXCEL_ENGINE = "calamine" if pandas_version >= (2, 2) else "openpyxl"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
 
-        # Process categories from xlsx
-        if categories is not None:
-            cats = categories.loc[key]
-            cat_labels = list(cats.index)
 
-            for cat_label in cat_labels:
-                prev_props = props.get(cat_label)
-                if prev_props is None:
-                    prev_props = []
+def read_categories(filename, cache_dir=".cache"):
+    """Read the paper categories from xlsx. The parsed sheet is cached
+    as pickle keyed by the SHA-1 of the xlsx file, so that the slow
+    Excel parsing is only done when the file changed. Cached sheets of
+    earlier versions of the file are removed.
 
-                prev_props.append(cats[cat_label])
+    :param filename: path to the xlsx file with a sheet named "main"
+    :type filename: str
+    :param cache_dir: directory for the cached sheets
+    :type cache_dir: str
+    :return: categories per paper
+    :rtype: pandas DataFrame
+    """
+
+    with open(filename, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+
+    name = os.path.splitext(os.path.basename(filename))[0]
+    cache_name = name + "_" + digest + ".pkl"
+    cache_file = os.path.join(cache_dir, cache_name)
+
+    if os.path.isfile(cache_file):
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception:
+            # E.g. written by another pandas version, parse the xlsx again.
+            msg.warn(f"Ignoring unreadable cache file {cache_file}.")
+
+    categories = pd.read_excel(
+        filename, sheet_name="main", header=[0], engine=EXCEL_ENGINE
+    )
 
-                props.update({cat_label: prev_props})
+    # Write to a temporary file first, so that an interrupted run does not
+    # leave a truncated cache file behind.
+    os.makedirs(cache_dir, exist_ok=True)
+    categories.to_pickle(cache_file + ".tmp")
+    os.replace(cache_file + ".tmp", cache_file)
 
-        # Get publication year and ids
-        for article in raw_graph["articles"]:
-            if article["key"] == key:
-                all_years.append(article["year"])
-                all_ids.append(key_to_label[article["key"]])
-                break
+    # Remove the cached sheets of earlier versions of the file.
+    outdated = re.compile(re.escape(name) + r"_[0-9a-f]{40}\.pkl")
+    for cached in os.listdir(cache_dir):
+        if cached != cache_name and outdated.fullmatch(cached):
+            os.remove(os.path.join(cache_dir, cached))
 
-    props.update({"ID": all_ids, "pub_year": all_years})
+    return categories
+
+
+def get_additional_properties(raw_graph, key_to_label):
+
+    filename = "paper_categories.xlsx"
+    if os.path.isfile(filename):
+        categories = read_categories(filename)
+        categories.set_index("Paper", inplace=True)
+    else:
+        categories = None
+
+    # Get publication year and ids
+    articles = pd.DataFrame(raw_graph["articles"], columns=["key", "year"])
+    articles["ID"] = articles["key"].map(key_to_label)
+    ids_and_years = articles[["ID", "year"]].rename(
+        columns={"year": "pub_year"}
+    )
+
+    # Align categories from xlsx with the articles in a single pass
+    if categories is not None:
+        cats = categories.reindex(articles["key"]).reset_index(drop=True)
+        additional_properties = pd.concat([cats, ids_and_years], axis=1)
+    else:
+        additional_properties = ids_and_years
 
-    additional_properties = pd.DataFrame(props)
     additional_properties.set_index("ID", inplace=True)
 
     return additional_properties
@@ -72,44 +127,33 @@ def create_graph_with_networkx(raw_graph, key_to_label):
     all_nodes = [
         key_to_label[article["key"]] for article in raw_graph["articles"]
     ]
-    sources = [key_to_label[edge["from"]] for edge in raw_graph["edges"]]
-    targets = [key_to_label[edge["to"]] for edge in raw_graph["edges"]]
-
-    df = pd.DataFrame({"From": sources, "To": targets})
+    edges = [
+        (key_to_label[edge["from"]], key_to_label[edge["to"]])
+        for edge in raw_graph["edges"]
+    ]
 
+    # Build graph
     # You may want to define an edge weight according to the number of
     # occurrences of an edge. However, for our citation graph an edge should
-    # always occur only once.
+    # always occur only once, and a DiGraph keeps duplicate edges only once.
     # Additionally, you may want to define other node or edge attributes.
     # However, we do it further below.
-    df_graph = df.groupby(["From", "To"]).size().reset_index()
-    df_graph.columns = ["From", "To", "Count"]
-    print(df_graph)
-
-    # Build graph
-    graph = nx.from_pandas_edgelist(
-        df_graph, source="From", target="To", create_using=nx.DiGraph()
-    )  # edge_attr="Count"
-
-    # Add isolated nodes
-    for node in all_nodes:
-        graph.add_node(node)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(all_nodes)
+    graph.add_edges_from(edges)
 
     # Load categories from xlsx
     additional_properties = get_additional_properties(raw_graph, key_to_label)
 
-    # Add additional attributes to node
-    for node in graph.nodes:
-
-        # Add labels attribute so that other tools like yED
-        # can access the labels after exporting the graph
-        # as .graphml file.
-        graph.nodes[node]["label"] = node
+    # Add labels attribute so that other tools like yED
+    # can access the labels after exporting the graph
+    # as .graphml file.
+    nx.set_node_attributes(graph, dict(zip(graph.nodes, graph.nodes)), "label")
 
-        # Add additional information about paper
-        row = additional_properties.loc[node]
-        for prop in list(row.index):
-            graph.nodes[node][prop] = row[prop]
+    # Add additional information about paper
+    nx.set_node_attributes(
+        graph, additional_properties.to_dict(orient="index")
+    )
 
     return graph, additional_properties
 
@@ -140,6 +184,12 @@ def visualize_graph_with_networkx(
     :type additional_properties: pandas DataFrame
     """
 
+    # Plotting libraries are only imported when needed since
+    # they take long to import.
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
     # Figure width in inches
     # Their are many more layout algorithm, however, GraphViz neato seems to
     # yield decent results.
@@ -214,128 +264,170 @@ def visualize_graph_with_networkx(
 
     additional_properties = additional_properties.reindex(graph.nodes())
 
-    for category in list(additional_properties.columns):
+    # Get the postion of the nodes. The layout does not depend on the
+    # category, so it is computed only once for all figures.
+    if layout_algorithm in [
+        "dot",
+        "neato",
+        "fdp",
+        "sfdp",
+        "twopi",
+        "circo",
+    ]:
+        pos = nx.nx_agraph.graphviz_layout(
+            graph, prog=layout_algorithm
+        )  # dot, neato, fdp, sfdp, twopi, circo
+    elif layout_algorithm == "circular_layout":
+        pos = nx.circular_layout(graph)
+    elif layout_algorithm == "spring_layout":
+        pos = nx.spring_layout(graph, k=10 / math.sqrt(graph.order()))
+    elif layout_algorithm == "kamada_kawai_layout":
+        pos = nx.kamada_kawai_layout(graph)
+
+    node_xy = np.array([pos[node] for node in graph.nodes])
+
+    # Shift labels sideways.
+    if shift_labels > 0:
+        pos_shift = dict(zip(graph.nodes, node_xy + [shift_labels, 0]))
+    else:
+        pos_shift = pos
 
-        category_values = set(additional_properties[category])
+    # Values of each category as plain arrays in the order of graph.nodes
+    col_arrays = {
+        category: additional_properties[category].to_numpy()
+        for category in additional_properties.columns
+    }
 
-        # Sort if possible
-        try:
-            num_category_values = [int(v) for v in category_values]
-            category_values = sorted(category_values)
-            is_categorical_variable = False
-        except:
-            is_categorical_variable = True
-
-        # Init plot.
-        fig, ax = plt.subplots(constrained_layout=True)
-
-        # Add a title.
-        if show_title:
-            font = {"color": "k", "fontweight": "bold", "fontsize": 20}
-            ax.set_title("Citation Graph", font)
-
-        # Get the postion of the nodes.
-        if layout_algorithm in [
-            "dot",
-            "neato",
-            "fdp",
-            "sfdp",
-            "twopi",
-            "circo",
-        ]:
-            pos = nx.nx_agraph.graphviz_layout(
-                graph, prog=layout_algorithm
-            )  # dot, neato, fdp, sfdp, twopi, circo
-        elif layout_algorithm == "circular_layout":
-            pos = nx.circular_layout(graph)
-        elif layout_algorithm == "spring_layout":
-            pos = nx.spring_layout(graph, k=10 / math.sqrt(graph.order()))
-        elif layout_algorithm == "kamada_kawai_layout":
-            pos = nx.kamada_kawai_layout(graph)
-
-        # Get the color map.
-        if is_categorical_variable:
-            # Define colors for categorical variables.
-            if len(category_values) <= 10:
-                # This map has only ten different colors defined.
-                palette = "tab10"
+    # Figures are written to disk in the background while the
+    # figure of the next category is drawn. Pyplot is not thread-safe,
+    # so the figures are closed here once they are written.
+    with ThreadPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1)
+    ) as executor:
+        exports = []
+
+        for category, node_values in col_arrays.items():
+
+            # Sort if possible
+            num_node_values = pd.to_numeric(node_values, errors="coerce")
+            is_categorical_variable = pd.isna(num_node_values).any()
+            if is_categorical_variable:
+                category_values = set(node_values)
             else:
-                # For arbitrary number of categories.
-                palette = "hls"
-
-            colors = sns.color_palette(palette, len(category_values))
+                node_values = num_node_values.astype(int)
+                num_category_values = np.unique(node_values)
+                category_values = num_category_values
+
+            # Init plot.
+            fig, ax = plt.subplots(constrained_layout=True)
+
+            # Add a title.
+            if show_title:
+                font = {"color": "k", "fontweight": "bold", "fontsize": 20}
+                ax.set_title("Citation Graph", font)
+
+            # Get the color map.
+            if is_categorical_variable:
+                # Define colors for categorical variables.
+                if len(category_values) <= 10:
+                    # This map has only ten different colors defined.
+                    palette = "tab10"
+                else:
+                    # For arbitrary number of categories.
+                    palette = "hls"
+
+                colors = sns.color_palette(palette, len(category_values))
 
-        else:
-            # Define colors for continues variables.
-            palette = sns.color_palette(
-                "viridis_r",
-                max(num_category_values) - min(num_category_values) + 1,
+            else:
+                # Define colors for continues variables.
+                palette = sns.color_palette(
+                    "viridis_r",
+                    max(num_category_values) - min(num_category_values) + 1,
+                )
+                colors = []
+                for i, v in enumerate(
+                    range(
+                        min(num_category_values), max(num_category_values) + 1
+                    )
+                ):
+                    if v in num_category_values:
+                        colors.append(palette[i])
+
+            # Add all nodes at once, colored by their category value.
+            value_to_color = dict(zip(category_values, colors))
+            node_colors = [value_to_color.get(v) for v in node_values]
+            has_color = np.array(
+                [c is not None for c in node_colors], dtype=bool
             )
-            colors = []
-            for i, v in enumerate(
-                range(min(num_category_values), max(num_category_values) + 1)
-            ):
-                if v in num_category_values:
-                    colors.append(palette[i])
-
-        # Add nodes of current category.
-        for color, category_value in zip(colors, category_values):
-            nodes_of_category = additional_properties.index[
-                additional_properties[category] == category_value
-            ].tolist()
-            nx.draw_networkx_nodes(
-                graph,
-                pos=pos,
-                nodelist=nodes_of_category,
-                node_size=node_size,
-                node_color=np.array([color]),
-                label=category_value,
+            ax.scatter(
+                node_xy[has_color, 0],
+                node_xy[has_color, 1],
+                s=node_size,
+                c=np.array([c for c in node_colors if c is not None]),
+                zorder=2,
             )
 
-        # Shift labels sideways.
-        if shift_labels > 0:
-            pos_shift = {}
-            for node, coords in pos.items():
-                pos_shift[node] = (coords[0] + shift_labels, coords[1])
-            pos = pos_shift
+            # Add edges.
+            nx.draw_networkx_edges(graph, pos=pos_shift, node_size=node_size)
 
-        # Add edges.
-        nx.draw_networkx_edges(graph, pos=pos, node_size=node_size)
-
-        # Add node labels.
-        nx.draw_networkx_labels(
-            graph, pos, font_size=fontsize, font_family="sans-serif"
-        )
+            # Add node labels.
+            nx.draw_networkx_labels(
+                graph, pos_shift, font_size=fontsize, font_family="sans-serif"
+            )
 
-        # Add a legend.
-        if category != "pub_year":
-            # No legend for publication year since
-            # it is likely too large for all years
-            # and the year can be read from the
-            # labels anyways.
-            plt.legend(scatterpoints=1)
-
-        # No frame around the figure.
-        ax.axis("off")
-
-        # Export figure.
-        plt.savefig(
-            export_path
-            + "_"
-            + category.lower().replace(" ", "_")
-            + "_colored."
-            + fig_format
-        )
+            # Add a legend.
+            if category != "pub_year":
+                # No legend for publication year since
+                # it is likely too large for all years
+                # and the year can be read from the
+                # labels anyways.
+                legend_handles = [
+                    Line2D(
+                        [],
+                        [],
+                        marker="o",
+                        markersize=math.sqrt(node_size),
+                        linestyle="",
+                        color=color,
+                        label=category_value,
+                    )
+                    for color, category_value in zip(colors, category_values)
+                ]
+                plt.legend(handles=legend_handles, numpoints=1)
+
+            # No frame around the figure.
+            ax.axis("off")
+
+            # Export figure.
+            future = executor.submit(
+                fig.savefig,
+                export_path
+                + "_"
+                + category.lower().replace(" ", "_")
+                + "_colored."
+                + fig_format,
+            )
+            exports.append((future, fig))
 
-        # For experimenting within jupyter notebooks you can define SVG
-        # as preferred format want to define:
-        # %config InlineBackend.figure_formats = ['svg']
+            # For experimenting within jupyter notebooks you can define SVG
+            # as preferred format want to define:
+            # %config InlineBackend.figure_formats = ['svg']
 
-        # Show graph with node color according to publication year
-        if category == "pub_year":
-            plt.show()
+            # Show graph with node color according to publication year
+            if category == "pub_year":
+                # Only this figure shall pop up, so close all others first.
+                for future, exported_fig in exports:
+                    future.result()
+                    if exported_fig is not fig:
+                        plt.close(exported_fig)
+                exports = []
+                plt.show()
+                plt.close(fig)
 
-        plt.close(fig)
+        # Wait until all figures are written and raise errors during export.
+        for future, exported_fig in exports:
+            future.result()
+            plt.close(exported_fig)
 
 
 def create_graph_with_pyvis(raw_graph):
@@ -347,6 +439,11 @@ def create_graph_with_pyvis(raw_graph):
     :rtype: pyvis.network.Network
     """
 
+    # Plotting libraries are only imported when needed since
+    # they take long to import.
+    import matplotlib
+    from pyvis.network import Network
+
     # Define nodes and edges
     sources = [edge["from"] for edge in raw_graph["edges"]]
     targets = [edge["to"] for edge in raw_graph["edges"]]
@@ -356,16 +453,13 @@ def create_graph_with_pyvis(raw_graph):
 
     # Define colors depending on publication year
     years = sorted(set(raw_graph["years"]))
-    cmap = plt.cm.get_cmap("plasma", len(years))
-
-    color_map = []
-    for i, color in enumerate(cmap.colors):
-        color_map.append([int(c * 255) for c in color[0:3]])
-        color_map[i].append(color[3])
+    cmap = matplotlib.colormaps["plasma"].resampled(len(years))
+    rgba = cmap(np.arange(len(years)))
+    rgb = (rgba[:, :3] * 255).astype(int)
 
     colors = {
-        year: "rgba" + str(tuple(color))
-        for (year, color) in zip(years, color_map)
+        year: f"rgba({r}, {g}, {b}, {a})"
+        for (year, (r, g, b), a) in zip(years, rgb, rgba[:, 3])
     }
 
     # Init network
@@ -376,18 +470,22 @@ def create_graph_with_pyvis(raw_graph):
     # Set the network layout
     graph.barnes_hut()
 
+    # Publication year per article
+    art_to_year = {
+        art: int(year)
+        for year, arts in raw_graph["year_arts"].items()
+        for art in arts
+    }
+
     # Build network
+    seen = set()
     for e in edge_data:
         src = e[0]
         dst = e[1]
         w = 1
 
-        years = raw_graph["year_arts"].keys()
-        year = lambda x: int(
-            [year for year in years if x in raw_graph["year_arts"][year]][0]
-        )
-        year_src = year(src)
-        year_dst = year(dst)
+        year_src = art_to_year[src]
+        year_dst = art_to_year[dst]
 
         expand_years = False
         if expand_years:
@@ -400,12 +498,16 @@ def create_graph_with_pyvis(raw_graph):
             while year_dst in all_levels:
                 year_dst += distance
 
-        graph.add_node(
-            src, src, title=src, level=year_src, color=colors[year_src]
-        )  # , physics=False)
-        graph.add_node(
-            dst, dst, title=dst, level=year_dst, color=colors[year_dst]
-        )  # , physics=False)
+        if src not in seen:
+            graph.add_node(
+                src, src, title=src, level=year_src, color=colors[year_src]
+            )  # , physics=False)
+            seen.add(src)
+        if dst not in seen:
+            graph.add_node(
+                dst, dst, title=dst, level=year_dst, color=colors[year_dst]
+            )  # , physics=False)
+            seen.add(dst)
         graph.add_edge(src, dst, value=w, arrowStrikethrough=False)
 
     return graph
@@ -487,17 +589,15 @@ def draw_graph(
 ):
 
     # Get graph model
-    with open(graph_model_file, encoding="utf-8") as f:
-        raw_graph = json.load(f)
+    raw_graph = load_json(graph_model_file)
 
     # Get article information
-    with open(json_bib_file, "r") as file:  # encoding='utf8'
-        bib = json.load(file)
+    bib = load_json(json_bib_file)
 
     articles = bib["final selection articles"]
-    key_to_label = {}
-    for article in articles:
-        key_to_label.update({article["bibtex_key"]: article["label"]})
+    key_to_label = {
+        article["bibtex_key"]: article["label"] for article in articles
+    }
 
     if save_fig or export:
         # Create graph with networkx
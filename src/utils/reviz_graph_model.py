@@ -29,14 +29,97 @@ SOFTWARE.
 
 import os
 import re
+import numpy as np
 import json
 import hashlib
+from collections import defaultdict
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
 from wasabi import msg
-from thefuzz import fuzz
-import xml.etree.ElementTree as et
+from rapidfuzz import fuzz, process
+from lxml import etree as et
 
 global user_answers
-user_answers = []
+user_answers = {}
+global user_answers_dir
+user_answers_dir = None
+
+URL_PATTERN = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\), ]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+)
+AUTHOR_PATTERN = re.compile(r"(?P<name>[A-Za-z\-]+)(?: +and +| +AND +|$)")
+AUTHOR_PATTERN_COMMA = re.compile(r"(?:^|and +|AND +)(?P<name>[A-Za-z\- ]+)")
+DOI_PATTERN = re.compile(r"(\d\d\.\d+\/\S+)")
+
+TEI_NAMESPACES = {"tei": "http://www.tei-c.org/ns/1.0"}
+BIBL_STRUCT_XPATH = et.XPath(".//tei:biblStruct", namespaces=TEI_NAMESPACES)
+TITLE_XPATH = et.XPath("(.//tei:title)[1]", namespaces=TEI_NAMESPACES)
+DOI_XPATH = et.XPath(
+    '(.//tei:idno[@type="doi"])[1]', namespaces=TEI_NAMESPACES
+)
+SURNAME_XPATH = et.XPath(".//tei:surname", namespaces=TEI_NAMESPACES)
+
+
+def user_answers_file(graph_dir):
+    """
+    returns the path of the file with the answers of the user
+    :param graph_dir: directory of the graph model
+    :return: path of the json file with the answers
+    """
+    return os.path.join(graph_dir, ".user_answers.json")
+
+
+def load_user_answers(graph_dir):
+    """
+    loads the answers the user gave in previous runs into user_answers.
+    New answers are saved to the same directory.
+    :param graph_dir: directory of the graph model
+    """
+    global user_answers_dir
+    user_answers_dir = graph_dir
+
+    filename = user_answers_file(graph_dir)
+    if not os.path.isfile(filename):
+        return
+    with open(filename, encoding="utf-8") as f:
+        answers = json.load(f)
+
+    for title_art, title_ref, author_art, authors_ref, answer in answers:
+        question = (
+            title_art,
+            title_ref,
+            tuple(author_art),
+            tuple(authors_ref),
+        )
+        user_answers[question] = answer
+
+
+def set_user_answers(answers):
+    """
+    adds answers of the user, e.g. in worker processes
+    :param answers: answers by question
+    """
+    user_answers.update(answers)
+
+
+def save_user_answers():
+    """
+    saves all answers of the user to the directory they were loaded from,
+    so that they can be reused in later runs
+    """
+    if user_answers_dir is None or not user_answers:
+        return
+
+    # The author tuples of the questions are stored as lists
+    answers = [
+        list(question) + [answer] for question, answer in user_answers.items()
+    ]
+
+    # Replace the file at once, so that it is never left half-written
+    filename = user_answers_file(user_answers_dir)
+    with open(filename + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(answers, f, indent=2)
+    os.replace(filename + ".tmp", filename)
 
 
 def key_to_md5(key):
@@ -47,9 +130,8 @@ def key_to_md5(key):
     :param key: bibtex-key of an article
     :return: converted key, first six characters of the key md5-sum
     """
-    m = hashlib.md5()
-    m.update(key.encode("utf-8"))
-    hd = m.hexdigest()
+    # The hash is only used to shorten the key, not for security
+    hd = hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()
     shorthd = hd[:6]
     if shorthd.isdigit():
         return shorthd + "a"
@@ -64,10 +146,7 @@ def find_urls(string):
     :param string: link to the pdf of an article
     :return: url if one is found
     """
-    url = re.findall(
-        r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\), ]|(?:%[0-9a-fA-F][0-9a-fA-F]))+",
-        string,
-    )
+    url = URL_PATTERN.findall(string)
     return url
 
 
@@ -78,13 +157,14 @@ def find_author(author_json):
     :return: list of all surnames
     """
     if "," not in author_json:
-        pattern = re.compile(r"(?P<name>[A-Za-z\-]+)(?: +and +| +AND +|$)")
+        pattern = AUTHOR_PATTERN
     else:
-        pattern = re.compile(r"(?:^|and +|AND +)(?P<name>[A-Za-z\- ]+)")
+        pattern = AUTHOR_PATTERN_COMMA
     authors = pattern.findall(author_json)
     return authors
 
 
+@lru_cache(maxsize=None)
 def find_doi(input):
     """
     checks if the doi of an article is syntactically correct or empty
@@ -93,14 +173,38 @@ def find_doi(input):
     """
     if input is None:
         return None
-    regex = r"(\d\d\.\d+\/\S+)"
-    regex = re.compile(regex)
-    m = regex.search(input)
+    m = DOI_PATTERN.search(input)
     if m is not None:
         return m.group()
     return None
 
 
+def clean_title(title):
+    """
+    normalizes a title for comparison by removing curly braces
+    and converting it to upper case
+    :param title: title of an article
+    :return: normalized title, None if no title is given
+    """
+    if type(title) != str:
+        return None
+    return title.replace("{", "").replace("}", "").upper()
+
+
+def char_histogram(title, bins=128):
+    """
+    counts the characters of a normalized title, characters are put
+    into a fixed number of bins by their code point
+    :param title: normalized title of an article or None
+    :param bins: number of bins
+    :return: numpy array with the number of characters per bin
+    """
+    if title is None:
+        return np.zeros(bins, dtype=int)
+    codes = np.frombuffer(title.encode("utf-32-le"), dtype=np.uint32)
+    return np.bincount(codes % bins, minlength=bins)
+
+
 def find_matching_authors(artauthors, otherauthors):
     """
     calculates the total number of authors and the number of shared authors
@@ -113,43 +217,181 @@ def find_matching_authors(artauthors, otherauthors):
     number = len(artauthors) + len(otherauthors)
     if len(artauthors) == 0 or len(otherauthors) == 0:
         return counter, number
-    for author in artauthors:
+
+    # Compare all authors with each other at once. Scores below
+    # the cutoff are set to zero.
+    has_similar_author = process.cdist(
+        [author.upper() for author in artauthors],
+        [a.upper() for a in otherauthors],
+        scorer=fuzz.ratio,
+        score_cutoff=95,
+    ).any(axis=1)
+
+    for author, is_similar in zip(artauthors, has_similar_author):
         if author == artauthors[0]:
             if author == otherauthors[0]:
                 counter += 5
                 number -= 1
-            elif (
-                next(
-                    (
-                        a
-                        for a in otherauthors
-                        if fuzz.ratio(author.upper(), a.upper()) >= 95
-                    ),
-                    None,
-                )
-                is not None
-            ):
+            elif is_similar:
                 counter += 3
                 number -= 1
         elif author == otherauthors[0]:
             counter += 3
             number -= 1
-        elif (
-            next(
-                (
-                    a
-                    for a in otherauthors
-                    if fuzz.ratio(author.upper(), a.upper()) >= 95
-                ),
-                None,
-            )
-            is not None
-        ):
+        elif is_similar:
             counter += 1
             number -= 1
     return counter, number
 
 
+@lru_cache(maxsize=None)
+def match_decision(
+    doi_art, doi_ref, clean_title_art, clean_title_ref, author_art, authors_ref
+):
+    """
+    decides whether a reference and an article match based on their
+    normalized DOIs, titles and authors. The result is cached since the
+    same pairs recur across the references of different PDFs.
+    :param doi_art: normalized doi of the article
+    :param doi_ref: normalized doi of the reference
+    :param clean_title_art: normalized article title
+    :param clean_title_ref: normalized reference title
+    :param author_art: article authors as tuple
+    :param authors_ref: reference authors as tuple
+    :return: True if they match, False if not, None if unsure
+    """
+    if doi_art == doi_ref and doi_art is not None and doi_ref is not None:
+        # That was easy, DOIs match.
+        return True
+
+    elif clean_title_art is not None and clean_title_ref is not None:
+
+        # The similarity cannot exceed 200 * shorter / (both lengths),
+        # so titles of very different length cannot match.
+        len_art, len_ref = len(clean_title_art), len(clean_title_ref)
+        if 200 * min(len_art, len_ref) <= 60 * (len_art + len_ref):
+            return False
+
+        # Get similarity between titles. Scores below the cutoffs are
+        # returned as zero, which allows RapidFuzz to stop early.
+        lev = fuzz.ratio(clean_title_art, clean_title_ref, score_cutoff=60)
+        if lev <= 60:
+            return False
+        lev_partial = fuzz.partial_ratio(
+            clean_title_art, clean_title_ref, score_cutoff=90
+        )
+
+        if lev > 90 or (lev_partial > 95 and lev > 70):
+            # Titles can be considered matching.
+            counter, number = find_matching_authors(author_art, authors_ref)
+
+            if counter >= 2:
+                # Authors can be considered matching.
+                return True
+            else:
+                # Authors seem not to match.
+                return None
+
+        elif lev_partial > 90 and lev > 60:
+            # Titles seem not to match.
+            return None
+
+        else:
+            # Consider it certain that the titles do not match.
+            return False
+    else:
+        return False
+
+
+def normalized_citation_matching(
+    doi_art,
+    doi_ref,
+    clean_title_art,
+    clean_title_ref,
+    author_art,
+    authors_ref,
+    without_interactive_queries,
+):
+    """
+    Checks if a reference and an article of the citation graph match,
+    if yes a citation is found. Same as citation_matching, but expects
+    DOIs normalized with find_doi and titles normalized with clean_title.
+
+    :param doi_art: normalized doi of the article
+    :param doi_ref: normalized doi of the reference
+    :param clean_title_art: normalized article title
+    :param clean_title_ref: normalized reference title
+    :param author_art: article authors
+    :param authors_ref: reference authors
+    :param without_interactive_queries: true for interactive mode
+    :return: True iff a match is found
+    """
+
+    def ask_user(title_art, title_ref, author_art, authors_ref):
+
+        global user_answers
+
+        # Check if user already answered this question before, also
+        # when running without interactive queries
+        question = (
+            title_art,
+            title_ref,
+            tuple(author_art),
+            tuple(authors_ref),
+        )
+        answer = user_answers.get(question)
+        if answer is not None:
+            return answer
+
+        if without_interactive_queries:
+            return False
+
+        # Prompt a question to the user and get his answer
+        msg.warn("Unsure whether the entries belong together or not:")
+        print(
+            "Article:  Title = "
+            + title_art
+            + "\n\t  Authors = "
+            + str(author_art).strip("[]")
+            + "\nReference: Title = "
+            + title_ref
+            + "\n\t Authors = "
+            + str(authors_ref).strip("[]")
+        )
+
+        msg.text(
+            "Do both entries belong to the same article?",
+            color="grey",
+        )
+        msg.text(
+            "Please enter 'y' or 'n'...",
+            color="grey",
+        )
+        # Save every answer right away, so that none get lost if the
+        # run is aborted.
+        user_answers[question] = input() == "y"
+        save_user_answers()
+        return user_answers[question]
+
+    # The decision only depends on the normalized data and is cached
+    decision = match_decision(
+        doi_art,
+        doi_ref,
+        clean_title_art,
+        clean_title_ref,
+        tuple(author_art),
+        tuple(authors_ref),
+    )
+
+    if decision is None:
+        # Unsure whether the entries match. Ask the user for help!
+        return ask_user(
+            clean_title_art, clean_title_ref, author_art, authors_ref
+        )
+
+    return decision
+
+
 def citation_matching(
     doi_art,
     doi_ref,
@@ -173,89 +415,174 @@ def citation_matching(
     :return: True iff a match is found
     """
 
-    def ask_user(title_art, title_ref, author_art, authors_ref):
+    return normalized_citation_matching(
+        find_doi(doi_art),
+        find_doi(doi_ref),
+        clean_title(title_art),
+        clean_title(title_ref),
+        author_art,
+        authors_ref,
+        without_interactive_queries,
+    )
 
-        global user_answers
 
-        if without_interactive_queries:
-            return False
-        else:
+def find_references(
+    index,
+    articles,
+    art_titles,
+    art_dois,
+    art_authors,
+    art_histograms,
+    art_title_lens,
+    doi_index,
+    title_index,
+    tei,
+    without_interactive_queries,
+):
+    """
+    finds the references in the TEI file of an article's PDF that are
+    included in the given set of articles
+    :param index: index of the examined article in articles
+    :param articles: all articles of the citation graph
+    :param art_titles: normalized titles of all articles
+    :param art_dois: normalized dois of all articles
+    :param art_authors: authors of all articles
+    :param art_histograms: character histograms of the normalized titles
+    :param art_title_lens: lengths of the normalized titles
+    :param doi_index: indices of the articles by normalized doi
+    :param title_index: indices of the articles by normalized title
+    :param tei: directory of the TEI files
+    :param without_interactive_queries: true for interactive mode
+    :return: list of edges from the article to the referenced articles
+    """
+    article = articles[index]
+    edges = []
 
-            # Check if user already answered this question before
-            question = (title_art, title_ref, author_art, authors_ref)
-            for user_answer in user_answers:
-                if user_answer["question"] == question:
-                    return user_answer["answer"]
-
-            # Prompt a question to the user and get his answer
-            msg.warn("Unsure whether the entries belong together or not:")
-            print(
-                "Article:  Title = "
-                + title_art
-                + "\n\t  Authors = "
-                + str(author_art).strip("[]")
-                + "\nReference: Title = "
-                + title_ref
-                + "\n\t Authors = "
-                + str(authors_ref).strip("[]")
-            )
+    # Check if field for file references is used
+    if article["file"] is None:
+        return edges
 
-            msg.text(
-                "Do both entries belong to the same article?",
-                color="grey",
-            )
-            msg.text(
-                "Please enter 'y' or 'n'...",
-                color="grey",
-            )
-            if input() == "y":
-                user_answers.append({"question": question, "answer": True})
-                return True
-            else:
-                user_answers.append({"question": question, "answer": False})
-                return False
+    # Get filename of TEI corresponding to PDF
+    xmlName = os.path.basename(article["file"])[:-4]
+    tei_file = os.path.join(tei, "{}.tei.xml".format(xmlName))
 
-    doi_art = find_doi(doi_art)
-    doi_ref = find_doi(doi_ref)
+    # Check if TEI file exists
+    if not os.path.isfile(tei_file):
+        msg.fail("tei-file not found for " + article["title"])
+        return edges
 
-    if doi_art == doi_ref and doi_art is not None and doi_ref is not None:
-        # That was easy, DOIs match.
-        return True
+    # Check if TEI content is empty. In this case Grobid only writes a
+    # short error message, so larger files do not need to be read.
+    if os.path.getsize(tei_file) < 200:
+        with open(tei_file, "r", encoding="utf8") as f:
+            tei_content = f.read()
 
-    elif type(title_art) == str and type(title_ref) == str:
+        if tei_content in [
+            "[NO_BLOCKS] PDF parsing resulted in empty content",
+            "[BAD_INPUT_DATA] PDF to XML conversion failed with error code: 1",
+        ]:
+            msg.fail("tei-file is empty for", article["title"])
+            return edges
 
-        # Normalize titles
-        clean_title_art = title_art.replace("{", "").replace("}", "").upper()
-        clean_title_ref = title_ref.replace("{", "").replace("}", "").upper()
+    print("")
+    msg.text("Processing " + tei_file, color="blue")
 
-        # Get similarity between titles
-        lev = fuzz.ratio(clean_title_art, clean_title_ref)
-        lev_partial = fuzz.partial_ratio(clean_title_art, clean_title_ref)
+    # Loop over all references that Grobid found
+    xml = et.parse(tei_file)
+    for ref in BIBL_STRUCT_XPATH(xml):
 
-        if lev > 90 or (lev_partial > 95 and lev > 70):
-            # Titles can be considered matching.
-            counter, number = find_matching_authors(author_art, authors_ref)
+        # Get title of referenced paper
+        ref_title = TITLE_XPATH(ref)
+        ref_title = ref_title[0].text if ref_title else None
 
-            if counter >= 2:
-                # Authors can be considered matching.
-                return True
-            else:
-                # Authors seem not to match. Ask the user for help!
-                return ask_user(
-                    clean_title_art, clean_title_ref, author_art, authors_ref
-                )
+        # Get DOI of referenced paper
+        ref_doi = DOI_XPATH(ref)
+        ref_doi = ref_doi[0].text if ref_doi else None
 
-        elif lev_partial > 90 and lev > 60:
-            # Titles seem not to match. Ask the user for help!
-            return ask_user(
-                clean_title_art, clean_title_ref, author_art, authors_ref
-            )
+        # Get authors of referenced paper
+        ref_authors = [ref_author.text for ref_author in SURNAME_XPATH(ref)]
 
-        else:
-            # Consider it certain that the titles do not match.
-            return False
-    else:
-        return False
+        # Normalize the reference once for all articles
+        ref_doi = find_doi(ref_doi)
+        ref_title = clean_title(ref_title)
+
+        # DOIs match exactly, so look them up first
+        cited = [i for i in doi_index.get(ref_doi, []) if i != index]
+        if cited:
+            edge = {
+                "from": article["bibtex_key"],
+                "to": articles[cited[0]]["bibtex_key"],
+            }
+            edges.append(edge)
+            continue
+
+        # Identical titles only need matching authors
+        cited = [
+            i
+            for i in title_index.get(ref_title, [])
+            if i != index
+            and find_matching_authors(art_authors[i], ref_authors)[0] >= 2
+        ]
+        if cited:
+            edge = {
+                "from": article["bibtex_key"],
+                "to": articles[cited[0]]["bibtex_key"],
+            }
+            edges.append(edge)
+            continue
+
+        # Characters that the titles do not have in common cannot be
+        # part of their longest common subsequence. This bounds the
+        # title similarity from above for all articles at once. Titles
+        # which cannot reach the minimum similarity of 60 are skipped.
+        ref_title_len = len(ref_title) if ref_title is not None else 0
+        total_lens = art_title_lens + ref_title_len
+        unshared = np.abs(art_histograms - char_histogram(ref_title))
+        max_similarity = 100 * (total_lens - unshared.sum(axis=1))
+        candidates = np.flatnonzero(max_similarity > 60 * total_lens)
+
+        # Score the remaining titles in one batch and keep only those
+        # with a similarity of at least 60. The exact comparison is done
+        # in normalized_citation_matching.
+        if len(candidates) > 0:
+            similarity = process.cdist(
+                [ref_title],
+                [art_titles[i] for i in candidates],
+                scorer=fuzz.ratio,
+                score_cutoff=60,
+            )[0]
+            candidates = candidates[similarity >= 60]
+
+        # Check if the referenced paper is included in the
+        # given set of papers. If so, add an edge between
+        # the current paper and the referenced paper.
+        for i in candidates:
+            art = articles[i]
+
+            if i == index:
+                # An article cannot cite itself
+                continue
+
+            elif normalized_citation_matching(
+                art_dois[i],
+                ref_doi,
+                art_titles[i],
+                ref_title,
+                art_authors[i],
+                ref_authors,
+                without_interactive_queries,
+            ):
+                # This article matches the references, therefore add an
+                # edge between this article and the article referencing
+                # this article.
+                edge = {
+                    "from": article["bibtex_key"],
+                    "to": art["bibtex_key"],
+                }
+                edges.append(edge)
+                break
+
+    return edges
 
 
 def build_graph_model(
@@ -304,6 +631,9 @@ def build_graph_model(
     }"""
     msg.divider("Build citation graph model from references in PDFs")
 
+    # Reuse the answers the user gave when the graph was built before
+    load_user_answers(graph_dir)
+
     with open(json_bib_file, "r") as file:  # encoding='utf8'
         bib = json.load(file)
 
@@ -317,26 +647,47 @@ def build_graph_model(
     graph = {}
 
     # Add years (e.g., "years": [2017, 2016, 2019, 2019, 2020, 2019,...])
+    # and collect the articles per year in the same pass
     years = []
+    arts_per_year = defaultdict(list)
     for article in articles:
         if article["year"] is not None:
-            years.append(int(article["year"]))
+            year = int(article["year"])
+            years.append(year)
+            arts_per_year[year].append(article["bibtex_key"])
 
     graph["years"] = years
 
     # Add year_arts
     graph["year_arts"] = {}
     for year in range(min(years), max(years) + 1):
-        this_year_arts = []
-        for article in articles:
-            if int(article["year"]) == year:
-                this_year_arts.append(article["bibtex_key"])
-        graph["year_arts"][year] = this_year_arts
+        graph["year_arts"][year] = arts_per_year.get(year, [])
+
+    # Normalize the article data once for matching the references
+    art_titles = [clean_title(art["title"]) for art in articles]
+    art_dois = [find_doi(art.get("doi")) for art in articles]
+    art_authors = [find_author(art["author"]) for art in articles]
+
+    # Index articles by DOI so that references with a known DOI
+    # are found without comparing them to every article
+    doi_index = {}
+    for i, doi in enumerate(art_dois):
+        if doi is not None:
+            doi_index.setdefault(doi, []).append(i)
+
+    # Index articles by title to find identical titles without fuzzy matching
+    title_index = {}
+    for i, title in enumerate(art_titles):
+        if title:
+            title_index.setdefault(title, []).append(i)
+
+    # Character histograms of the titles to skip dissimilar titles early
+    art_histograms = np.array([char_histogram(t) for t in art_titles])
+    art_title_lens = np.array([len(t) if t else 0 for t in art_titles])
 
     # Add articles
     graph["articles"] = []
-    for article in articles:
-        authors = find_author(article["author"])
+    for article, authors in zip(articles, art_authors):
         article_dict = {
             "title": article["title"],
             "author": authors,
@@ -347,90 +698,45 @@ def build_graph_model(
 
     # Add edges
     graph["edges"] = []
-    namespace = "{http://www.tei-c.org/ns/1.0}"
-
-    for article in articles:
-
-        # Check if field for file references is used
-        if article["file"] is None:
-            continue
-
-        # Get filename of TEI corresponding to PDF
-        xmlName = os.path.basename(article["file"])[:-4]
-        tei_file = os.path.join(tei, "{}.tei.xml".format(xmlName))
 
-        # Check if TEI file exists
-        if not os.path.isfile(tei_file):
-            msg.fail("tei-file not found for " + article["title"])
-            continue
-
-        # Check if TEI content is empty
-        with open(tei_file, "r", encoding="utf8") as f:
-            tei_content = f.read()
-
-        if tei_content in [
-            "[NO_BLOCKS] PDF parsing resulted in empty content",
-            "[BAD_INPUT_DATA] PDF to XML conversion failed with error code: 1",
-        ]:
-            msg.fail("tei-file is empty for", article["title"])
-            continue
-
-        print("")
-        msg.text("Processing " + tei_file, color="blue")
-
-        # Loop over all references that Grobid found
-        xml = et.parse(tei_file)
-        for ref in xml.findall(".//{}biblStruct".format(namespace)):
-
-            # Get title of referenced paper
-            ref_title = ref.find(".//{}title".format(namespace)).text
-            ref_title = ref_title  # if ref_title is not None else 'Ohne Titel'
+    find = partial(
+        find_references,
+        articles=articles,
+        art_titles=art_titles,
+        art_dois=art_dois,
+        art_authors=art_authors,
+        art_histograms=art_histograms,
+        art_title_lens=art_title_lens,
+        doi_index=doi_index,
+        title_index=title_index,
+        tei=tei,
+        without_interactive_queries=without_interactive_queries,
+    )
+    if without_interactive_queries:
+        # The PDFs are independent of each other, so they are processed
+        # in parallel. Chunks keep the shared article data from being
+        # sent to the worker processes for every single article.
+        workers = os.cpu_count() or 1
+        # The stored answers are handed to the workers, since they do not
+        # share the memory of this process on every platform.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=set_user_answers,
+            initargs=(user_answers,),
+        ) as executor:
+            all_edges = list(
+                executor.map(
+                    find,
+                    range(len(articles)),
+                    chunksize=max(1, len(articles) // (4 * workers)),
+                )
+            )
+    else:
+        # The user may be asked for help, so process one after another.
+        all_edges = [find(index) for index in range(len(articles))]
 
-            # Get DOI of referenced paper
-            if (
-                ref.find('.//{}idno[@type="doi"]'.format(namespace))
-                is not None
-            ):
-                ref_doi = ref.find(
-                    './/{}idno[@type="doi"]'.format(namespace)
-                ).text
-            else:
-                ref_doi = None
-
-            # Get authors of referenced paper
-            ref_authors = []
-            for ref_author in ref.findall(".//{}surname".format(namespace)):
-                ref_authors.append(ref_author.text)
-
-            # Check if the referenced paper is included in the
-            # given set of papers. If so, add an edge between
-            # the current paper and the referenced paper.
-            for art in articles:
-                art_authors = find_author(art.get("author"))
-                art_doi = art.get("doi")
-
-                if art["title"] is article["title"]:
-                    # An article cannot cite itself
-                    continue
-
-                elif citation_matching(
-                    art_doi,
-                    ref_doi,
-                    art["title"],
-                    ref_title,
-                    art_authors,
-                    ref_authors,
-                    without_interactive_queries,
-                ):
-                    # This article matches the references, therefore add an
-                    # edge between this article and the article referencing
-                    # this article.
-                    edge = {
-                        "from": article["bibtex_key"],
-                        "to": art["bibtex_key"],
-                    }
-                    graph["edges"].append(edge)
-                    break
+    for edges in all_edges:
+        graph["edges"].extend(edges)
 
     with open(os.path.join(graph_dir, graph_filename), "w") as jf:
         json.dump(graph, jf, indent=2)